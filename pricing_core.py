@@ -0,0 +1,204 @@
+# ==============================================================
+# Shared pricing logic for the Laboratory Pricing Calculator
+# ==============================================================
+# Pure data loading and calculation helpers, kept separate from the
+# Streamlit page so any future page reuses the same cached loaders
+# and memoized scenario math.
+
+import io
+
+import streamlit as st
+import pandas as pd
+import numpy as np
+import requests
+
+# --- GOOGLE SHEET SETUP ---
+SHEET_ID = "1VAHAw4KVWuo-tP_rDlx3h_oYwypOodiJuZzhSYiX2v4"
+LABS = ("OPICLAB", "CHEVRONLAB")
+
+@st.cache_resource(show_spinner=False)
+def _session() -> requests.Session:
+    """Shared HTTP session so sheet fetches reuse one TCP/TLS connection."""
+    s = requests.Session()
+    s.headers.update({"Accept-Encoding": "gzip"})
+    return s
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def load_sheet(sheet_name: str) -> pd.DataFrame:
+    # Cached so slider/input reruns don't re-download and re-parse the sheet
+    url = f"https://docs.google.com/spreadsheets/d/{SHEET_ID}/gviz/tq?tqx=out:csv&sheet={sheet_name}"
+    response = _session().get(url, timeout=10)
+    response.raise_for_status()
+    df = pd.read_csv(io.BytesIO(response.content), engine="pyarrow")
+    df.columns = df.columns.str.strip().str.upper()
+    df[["CURRENT PRICE", "COGS"]] = df[["CURRENT PRICE", "COGS"]].apply(pd.to_numeric, errors="coerce").fillna(0.0)
+    if "OPEX %" in df.columns:
+        df["OPEX %"] = pd.to_numeric(df["OPEX %"], errors="coerce")
+    # Index by test name so per-test lookups are hash probes, not column scans
+    return df.set_index("TEST NAME")
+
+def round50(value):
+    return int(round(value / 50.0)) * 50
+
+def round50_vec(values):
+    # Vectorized round50: one ufunc pass over an array instead of a Python call per value
+    return np.rint(np.asarray(values, dtype=np.float64) / 50.0).astype(np.int64) * 50
+
+def margin_tenths(ebitda, revenue):
+    # Margin as integer tenths of a percent: branchless aside from the
+    # zero-revenue guard, no float round() per call
+    return 0 if revenue == 0 else int(ebitda * 1000 // revenue)
+
+def project_totals(n_volumes, price_per_test, profit_per_test):
+    """Revenue and profit totals for volumes 1..n.
+
+    float32 is plenty for chart pixels and halves the bytes Streamlit
+    pushes through its Arrow bridge to the frontend.
+    """
+    v = np.arange(1, n_volumes + 1, dtype=np.float32)
+    return price_per_test * v, profit_per_test * v
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def get_test_names(lab: str) -> tuple:
+    """Unique test names for a lab as an immutable tuple, scanned once per sheet load."""
+    return tuple(load_sheet(lab).index.unique())
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def get_opex_rate(lab: str) -> float:
+    """OPEX rate for a lab, from the first filled OPEX % cell (default 25%)."""
+    df = load_sheet(lab)
+    if "OPEX %" in df.columns and df["OPEX %"].notna().any():
+        return float(df["OPEX %"].dropna().iloc[0]) / 100
+    return 0.25
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def markup_overview(lab, markup, opex_rate, opex_adjustment):
+    """Scenario metrics for every test at the given markup, in one broadcast sweep.
+
+    All columns are computed as whole-array numpy expressions, so adding tests
+    to the sheet costs vector width rather than extra Python loops. Cached on
+    the scalar inputs so only a changed slider rebuilds the table.
+    """
+    df = load_sheet(lab)
+    current = df["CURRENT PRICE"].to_numpy(dtype=np.float64)
+    cogs = df["COGS"].to_numpy(dtype=np.float64)
+    proposed = round50_vec(cogs * markup).astype(np.float64)
+    opex = opex_rate * proposed * (1 + opex_adjustment / 100)
+    profit = proposed - cogs - opex
+    margin = np.divide(profit, proposed, out=np.zeros_like(profit), where=proposed > 0) * 100
+    # Preformatted strings, same as build_comparison, so the UI never shows raw floats
+    return pd.DataFrame({
+        "Current Price (₦)": [f"{x:,.0f}" for x in current],
+        "Proposed Price (₦)": [f"{x:,.0f}" for x in proposed],
+        "Difference (₦)": [f"{x:+,.0f}" for x in proposed - current],
+        "EBITDA per Test (₦)": [f"{x:,.0f}" for x in profit],
+        "Net Margin (%)": [f"{x:.1f}" for x in margin]
+    }, index=df.index)
+
+@st.cache_data(show_spinner=False)
+def current_scenario(price, cogs, opex_rate):
+    """Per-test OPEX, EBITDA and margin at the current price.
+
+    Depends only on the sheet values, not the sliders, so it's cached and
+    skipped entirely while the user drags markup/volume/adjustment widgets.
+    """
+    opex = opex_rate * price
+    profit = price - cogs - opex
+    return opex, profit, margin_tenths(profit, price) / 10
+
+@st.cache_data(show_spinner=False)
+def compute_scenario(current_price, cogs, opex_rate, proposed_price_override,
+                     markup, volume, opex_adjustment, target_margin):
+    """All scalar scenario math for one rerun, memoized by its inputs.
+
+    Users wiggle one slider back and forth, so repeated input combinations
+    are common; on a cache hit the whole block below is a dict lookup.
+    """
+    if proposed_price_override > 0:
+        # Use custom price if entered
+        proposed_price = round50(proposed_price_override)
+    else:
+        # Use markup multiplier
+        proposed_price = round50(cogs * markup)
+
+    current_opex, current_profit, current_margin = current_scenario(current_price, cogs, opex_rate)
+
+    proposed_opex = (opex_rate * proposed_price) * (1 + opex_adjustment / 100)
+    proposed_profit = proposed_price - cogs - proposed_opex
+    proposed_margin = margin_tenths(proposed_profit, proposed_price) / 10
+
+    min_price_needed = (cogs + proposed_opex) / (1 - target_margin / 100)
+    min_price_rounded = round50(min_price_needed)
+    margin_gap = proposed_price - min_price_needed
+
+    if margin_gap < 0:
+        margin_status = "Below Target"
+        status_color = "red"
+        recommendation = f"Increase price to at least ₦{min_price_rounded:,.0f}"
+    elif margin_gap < 500:
+        margin_status = "At Minimum"
+        status_color = "orange"
+        recommendation = "Price works but leaves little room for unexpected costs"
+    else:
+        margin_status = "Healthy Margin"
+        status_color = "green"
+        recommendation = "Price is within target range"
+
+    return {
+        "proposed_price": proposed_price,
+        "current_opex": current_opex,
+        "current_profit": current_profit,
+        "current_margin": current_margin,
+        "proposed_opex": proposed_opex,
+        "proposed_profit": proposed_profit,
+        "proposed_margin": proposed_margin,
+        "current_gross_profit": current_price - cogs,
+        "proposed_gross_profit": proposed_price - cogs,
+        "total_revenue": proposed_price * volume,
+        "total_profit": proposed_profit * volume,
+        "total_cogs": cogs * volume,
+        "total_opex": proposed_opex * volume,
+        "total_gross_profit": (proposed_price - cogs) * volume,
+        "min_price_rounded": min_price_rounded,
+        "margin_gap": margin_gap,
+        "margin_status": margin_status,
+        "status_color": status_color,
+        "recommendation": recommendation
+    }
+
+@st.cache_data(show_spinner=False)
+def build_comparison(current_price, proposed_price, cogs, current_opex, proposed_opex,
+                     current_profit, proposed_profit, current_margin, proposed_margin):
+    """Current-vs-proposed comparison table, memoized on its scalar inputs."""
+    # One contiguous array: column 0 = current, column 1 = proposed
+    scenario_vals = np.array([
+        [current_price, proposed_price],
+        [cogs, cogs],
+        [current_price - cogs, proposed_price - cogs],
+        [current_opex, proposed_opex],
+        [current_profit, proposed_profit],
+        [current_margin, proposed_margin]
+    ], dtype=np.float64)
+    diff_vals = scenario_vals[:, 1] - scenario_vals[:, 0]
+
+    # Round the currency rows to the nearest 50; the margin row keeps one decimal
+    money_rows = np.array([True, True, True, True, True, False])
+    current_col = np.where(money_rows, round50_vec(scenario_vals[:, 0]), scenario_vals[:, 0])
+    proposed_col = np.where(money_rows, round50_vec(scenario_vals[:, 1]), scenario_vals[:, 1])
+    diff_col = np.where(money_rows, round50_vec(diff_vals), np.round(diff_vals, 1))
+
+    # Preformatted strings: the table renders through Streamlit's plain Arrow
+    # path instead of the much slower Styler HTML pipeline
+    return pd.DataFrame({
+        "Metric": [
+            "Price per Test (₦)",
+            "COGS per Test (₦)",
+            "Gross Profit per Test (₦)",
+            "OPEX per Test (₦)",
+            "EBITDA per Test (₦)",
+            "Net Margin (%)"
+        ],
+        "Current": [f"{x:,.0f}" for x in current_col],
+        "Proposed": [f"{x:,.0f}" for x in proposed_col],
+        "Difference": [f"{x:+,.0f}" for x in diff_col]
+    })